@@ -74,7 +74,7 @@ def generate_labels(items, prefix='__'):
 
 
 def intervals_to_samples(intervals, labels, offset=0, sample_size=0.1,
-                         fill_value=None):
+                         fill_value=None, as_array=False):
     """Convert an array of labeled time intervals to annotated samples.
 
     Parameters
@@ -101,12 +101,18 @@ def intervals_to_samples(intervals, labels, offset=0, sample_size=0.1,
         Object to use for the label with out-of-range time points.
         (Default value = None)
 
+    as_array : bool
+        If True, return ``sample_times`` and ``sample_labels`` as
+        ``np.ndarray`` instead of lists.  This avoids converting numeric
+        labels (e.g., from :func:`index_labels`) to Python objects.
+        (Default value = False)
+
     Returns
     -------
-    sample_times : list
+    sample_times : list or np.ndarray
         list of sample times
 
-    sample_labels : list
+    sample_labels : list or np.ndarray
         array of labels for each generated sample
 
     Notes
@@ -119,14 +125,18 @@ def intervals_to_samples(intervals, labels, offset=0, sample_size=0.1,
     # Round intervals to the sample size
     num_samples = int(np.floor(intervals.max() / sample_size))
     sample_indices = np.arange(num_samples, dtype=np.float32)
-    sample_times = (sample_indices*sample_size + offset).tolist()
+    sample_times = sample_indices*sample_size + offset
     sampled_labels = interpolate_intervals(
-        intervals, labels, sample_times, fill_value)
+        intervals, labels, sample_times, fill_value, as_array=as_array)
+
+    if not as_array:
+        sample_times = sample_times.tolist()
 
     return sample_times, sampled_labels
 
 
-def interpolate_intervals(intervals, labels, time_points, fill_value=None):
+def interpolate_intervals(intervals, labels, time_points, fill_value=None,
+                          as_array=False):
     """Assign labels to a set of points in time given a set of intervals.
 
     Time points that do not lie within an interval are mapped to `fill_value`.
@@ -152,9 +162,16 @@ def interpolate_intervals(intervals, labels, time_points, fill_value=None):
         Object to use for the label with out-of-range time points.
         (Default value = None)
 
+    as_array : bool
+        If True, return the labels as an ``np.ndarray`` instead of a list.
+        If ``labels`` and ``fill_value`` are numeric, the array has a
+        numeric dtype wide enough to hold both; otherwise it is an object
+        array holding the labels unchanged.
+        (Default value = False)
+
     Returns
     -------
-    aligned_labels : list
+    aligned_labels : list or np.ndarray
         Labels corresponding to the given time points.
 
     Raises
@@ -169,11 +186,30 @@ def interpolate_intervals(intervals, labels, time_points, fill_value=None):
     if np.any(time_points[1:] < time_points[:-1]):
         raise ValueError('time_points must be in non-decreasing order')
 
-    aligned_labels = [fill_value] * len(time_points)
-
     starts = np.searchsorted(time_points, intervals[:, 0], side='left')
     ends = np.searchsorted(time_points, intervals[:, 1], side='right')
 
+    if as_array:
+        label_array = np.asarray(labels)
+        fill_array = np.asarray(fill_value)
+        if (label_array.ndim == 1 and label_array.dtype.kind in 'biuf' and
+                fill_array.ndim == 0 and fill_array.dtype.kind in 'biuf'):
+            # Numeric labels can be stored in a typed array
+            dtype = np.result_type(label_array, fill_array)
+        else:
+            # Other labels are stored as objects, without any conversion
+            dtype = object
+
+        aligned_labels = np.empty(len(time_points), dtype=dtype)
+        aligned_labels.fill(fill_value)
+
+        for (start, end, lab) in zip(starts, ends, labels):
+            aligned_labels[start:end].fill(lab)
+
+        return aligned_labels
+
+    aligned_labels = [fill_value] * len(time_points)
+
     for (start, end, lab) in zip(starts, ends, labels):
         aligned_labels[start:end] = [lab] * (end - start)
 
@@ -213,9 +249,9 @@ def f_measure(precision, recall, beta=1.0):
 
     Parameters
     ----------
-    precision : float in (0, 1]
+    precision : float in (0, 1] or np.ndarray
         Precision
-    recall : float in (0, 1]
+    recall : float in (0, 1] or np.ndarray
         Recall
     beta : float > 0
         Weighting factor for f-measure
@@ -223,11 +259,21 @@ def f_measure(precision, recall, beta=1.0):
 
     Returns
     -------
-    f_measure : float
-        The weighted f-measure
+    f_measure : float or np.ndarray
+        The weighted f-measure.
+        If ``precision`` or ``recall`` is an array, an array of f-measures
+        is returned, computed element-wise.
 
     """
 
+    if np.ndim(precision) > 0 or np.ndim(recall) > 0:
+        precision = np.asarray(precision, dtype=float)
+        recall = np.asarray(recall, dtype=float)
+        numerator = (1 + beta**2)*precision*recall
+        denominator = (beta**2)*precision + recall
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(denominator == 0, 0.0, numerator/denominator)
+
     if precision == 0 and recall == 0:
         return 0.0
 
@@ -251,7 +297,52 @@ def intervals_to_boundaries(intervals, q=5):
 
     """
 
-    return np.unique(np.ravel(np.round(intervals, decimals=q)))
+    boundaries = np.ravel(np.round(intervals, decimals=q))
+
+    # If the boundaries are already in order (e.g., contiguous segments),
+    # only adjacent duplicates need to be removed, which avoids a full sort
+    if _is_sorted(boundaries):
+        return _unique_sorted(boundaries)
+
+    return np.unique(boundaries)
+
+
+def _is_sorted(values):
+    """Check whether a 1-d array is in non-decreasing order.
+
+    Parameters
+    ----------
+    values : np.ndarray, shape=(n,)
+        Array of values
+
+    Returns
+    -------
+    is_sorted : bool
+        True if ``values[i] <= values[i + 1]`` for all ``i``
+    """
+    return bool(np.all(values[1:] >= values[:-1]))
+
+
+def _unique_sorted(values):
+    """Equivalent to ``np.unique(values)`` for an array which is already
+    in non-decreasing order, computed in linear time.
+
+    Parameters
+    ----------
+    values : np.ndarray, shape=(n,)
+        Array of values in non-decreasing order
+
+    Returns
+    -------
+    unique_values : np.ndarray
+        The unique entries of ``values``
+    """
+    if values.size == 0:
+        return values.copy()
+    keep = np.empty(values.shape, dtype=bool)
+    keep[0] = True
+    np.not_equal(values[1:], values[:-1], out=keep[1:])
+    return values[keep]
 
 
 def boundaries_to_intervals(boundaries):
@@ -272,7 +363,8 @@ def boundaries_to_intervals(boundaries):
     if not np.allclose(boundaries, np.unique(boundaries)):
         raise ValueError('Boundary times are not unique or not ascending.')
 
-    intervals = np.asarray(list(zip(boundaries[:-1], boundaries[1:])))
+    boundaries = np.asarray(boundaries)
+    intervals = np.stack((boundaries[:-1], boundaries[1:]), axis=1)
 
     return intervals
 
@@ -298,7 +390,7 @@ def adjust_intervals(intervals,
     Parameters
     ----------
     intervals : np.ndarray, shape=(n_events, 2)
-        Array of interval start and end-times
+        Array of interval start and end-times, in ascending order
     labels : list, len=n_events or None
         List of labels
         (Default value = None)
@@ -334,44 +426,70 @@ def adjust_intervals(intervals,
         raise ValueError("Supplied intervals are empty, can't append new"
                          " intervals")
 
+    if t_min is not None and t_max is not None and t_min > t_max:
+        raise ValueError('t_min ({}) must not be greater than '
+                         't_max ({})'.format(t_min, t_max))
+
+    # Intervals to add at either end are collected first, so that the
+    # output array is assembled with a single copy
+    start_interval, end_interval = None, None
+
     if t_min is not None:
-        # Find the intervals that end at or after t_min
-        first_idx = np.argwhere(intervals[:, 1] >= t_min)
+        # Find the first interval that ends at or after t_min
+        first_idx = np.searchsorted(intervals[:, 1], t_min, side='left')
 
-        if len(first_idx) > 0:
+        if first_idx < len(intervals):
             # If we have events below t_min, crop them out
             if labels is not None:
-                labels = labels[int(first_idx[0]):]
+                labels = labels[first_idx:]
             # Clip to the range (t_min, +inf)
-            intervals = intervals[int(first_idx[0]):]
+            intervals = intervals[first_idx:]
         intervals = np.maximum(t_min, intervals)
 
-        if intervals.min() > t_min:
+        first_boundary = intervals.min()
+        if first_boundary > t_min:
             # Lowest boundary is higher than t_min:
             # add a new boundary and label
-            intervals = np.vstack(([t_min, intervals.min()], intervals))
-            if labels is not None:
-                labels.insert(0, start_label)
+            start_interval = [t_min, first_boundary]
 
     if t_max is not None:
-        # Find the intervals that begin after t_max
-        last_idx = np.argwhere(intervals[:, 0] > t_max)
+        # Find the first interval that begins after t_max
+        last_idx = np.searchsorted(intervals[:, 0], t_max, side='right')
 
-        if len(last_idx) > 0:
+        if last_idx < len(intervals):
             # We have boundaries above t_max.
             # Trim to only boundaries <= t_max
             if labels is not None:
-                labels = labels[:int(last_idx[0])]
+                labels = labels[:last_idx]
             # Clip to the range (-inf, t_max)
-            intervals = intervals[:int(last_idx[0])]
+            intervals = intervals[:last_idx]
 
         intervals = np.minimum(t_max, intervals)
 
-        if intervals.max() < t_max:
+        if start_interval is not None:
+            start_interval[1] = min(start_interval[1], t_max)
+
+        if intervals.size == 0 and start_interval is not None:
+            # Only the new interval at t_min is left
+            last_boundary = start_interval[1]
+        else:
+            last_boundary = intervals.max()
+
+        if last_boundary < t_max:
             # Last boundary is below t_max: add a new boundary and label
-            intervals = np.vstack((intervals, [intervals.max(), t_max]))
+            end_interval = [last_boundary, t_max]
+
+    if start_interval is not None or end_interval is not None:
+        new_intervals = [intervals]
+        if start_interval is not None:
+            new_intervals.insert(0, [start_interval])
+            if labels is not None:
+                labels.insert(0, start_label)
+        if end_interval is not None:
+            new_intervals.append([end_interval])
             if labels is not None:
                 labels.append(end_label)
+        intervals = np.concatenate(new_intervals)
 
     return intervals, labels
 
@@ -389,7 +507,7 @@ def adjust_events(events, labels=None, t_min=0.0,
     Parameters
     ----------
     events : np.ndarray
-        Array of event times (seconds)
+        Array of event times (seconds), in ascending order
     labels : list or None
         List of labels
         (Default value = None)
@@ -410,14 +528,14 @@ def adjust_events(events, labels=None, t_min=0.0,
 
     """
     if t_min is not None:
-        first_idx = np.argwhere(events >= t_min)
+        first_idx = np.searchsorted(events, t_min, side='left')
 
-        if len(first_idx) > 0:
+        if first_idx < len(events):
             # We have events below t_min
             # Crop them out
             if labels is not None:
-                labels = labels[int(first_idx[0]):]
-            events = events[int(first_idx[0]):]
+                labels = labels[first_idx:]
+            events = events[first_idx:]
 
         if events[0] > t_min:
             # Lowest boundary is higher than t_min:
@@ -427,14 +545,14 @@ def adjust_events(events, labels=None, t_min=0.0,
                 labels.insert(0, '%sT_MIN' % label_prefix)
 
     if t_max is not None:
-        last_idx = np.argwhere(events > t_max)
+        last_idx = np.searchsorted(events, t_max, side='right')
 
-        if len(last_idx) > 0:
+        if last_idx < len(events):
             # We have boundaries above t_max.
             # Trim to only boundaries <= t_max
             if labels is not None:
-                labels = labels[:int(last_idx[0])]
-            events = events[:int(last_idx[0])]
+                labels = labels[:last_idx]
+            events = events[:last_idx]
 
         if events[-1] < t_max:
             # Last boundary is below t_max: add a new boundary and label
@@ -479,20 +597,24 @@ def intersect_files(flist1, flist2):
 
         Parameters
         ----------
-        abs_path :
-
+        abs_path : str
+            Path to a file
 
         Returns
         -------
+        name : str
+            The file name, without its directory or extension
 
         """
-        return os.path.splitext(os.path.split(abs_path)[-1])[0]
+        return os.path.splitext(os.path.basename(abs_path))[0]
 
     fmap = dict([(fname(f), f) for f in flist1])
     pairs = [list(), list()]
     for f in flist2:
-        if fname(f) in fmap:
-            pairs[0].append(fmap[fname(f)])
+        # Look up each file name only once
+        match = fmap.get(fname(f))
+        if match is not None:
+            pairs[0].append(match)
             pairs[1].append(f)
 
     return pairs
@@ -528,19 +650,27 @@ def merge_labeled_intervals(x_intervals, x_labels, y_intervals, y_labels):
         raise ValueError(
             "Time intervals do not align; did you mean to call "
             "'adjust_intervals()' first?")
-    time_boundaries = np.unique(
-        np.concatenate([x_intervals, y_intervals], axis=0))
-    output_intervals = np.array(
-        [time_boundaries[:-1], time_boundaries[1:]]).T
-
-    x_labels_out, y_labels_out = [], []
-    x_label_range = np.arange(len(x_labels))
-    y_label_range = np.arange(len(y_labels))
-    for t0, _ in output_intervals:
-        x_idx = x_label_range[(t0 >= x_intervals[:, 0])]
-        x_labels_out.append(x_labels[x_idx[-1]])
-        y_idx = y_label_range[(t0 >= y_intervals[:, 0])]
-        y_labels_out.append(y_labels[y_idx[-1]])
+    x_boundaries = np.ravel(x_intervals)
+    y_boundaries = np.ravel(y_intervals)
+    time_boundaries = np.concatenate([x_boundaries, y_boundaries])
+    if _is_sorted(x_boundaries) and _is_sorted(y_boundaries):
+        # Both sequences are contiguous, so the sort only has to merge
+        # two ordered runs before the duplicates are removed
+        time_boundaries = _unique_sorted(
+            np.sort(time_boundaries, kind='mergesort'))
+    else:
+        time_boundaries = np.unique(time_boundaries)
+    output_intervals = np.stack(
+        [time_boundaries[:-1], time_boundaries[1:]], axis=1)
+
+    # Each output interval takes the label of the last input interval
+    # starting at or before it
+    x_idx = np.searchsorted(x_intervals[:, 0], output_intervals[:, 0],
+                            side='right') - 1
+    y_idx = np.searchsorted(y_intervals[:, 0], output_intervals[:, 0],
+                            side='right') - 1
+    x_labels_out = [x_labels[i] for i in x_idx]
+    y_labels_out = [y_labels[i] for i in y_idx]
     return output_intervals, x_labels_out, y_labels_out
 
 
@@ -607,31 +737,42 @@ def _bipartite_match(graph):
 
         # did we finish layering without finding any alternating paths?
         if not unmatched:
-            unlayered = {}
-            for u in graph:
-                for v in graph[u]:
-                    if v not in preds:
-                        unlayered[v] = None
             return matching
 
-        def recurse(v):
-            """Recursively search backward through layers to find alternating
-            paths.  recursion returns true if found path, false otherwise
+        def augment(v):
+            """Search backward through layers to find alternating paths.
+            Returns true if found path, false otherwise.
+
+            The search is a depth-first traversal driven by an explicit
+            stack, so long alternating paths do not hit the recursion limit.
             """
-            if v in preds:
-                L = preds[v]
-                del preds[v]
-                for u in L:
+            if v not in preds:
+                return False
+            # Each frame holds a vertex in V, an iterator over its remaining
+            # neighbors in the previous layer, and the neighbor u through
+            # which the search descended into the next frame
+            stack = [[v, iter(preds.pop(v)), None]]
+            while stack:
+                frame = stack[-1]
+                for u in frame[1]:
                     if u in pred:
-                        pu = pred[u]
-                        del pred[u]
-                        if pu is unmatched or recurse(pu):
-                            matching[v] = u
+                        pu = pred.pop(u)
+                        if pu is unmatched:
+                            # Found a path: flip it from the deepest frame up
+                            matching[frame[0]] = u
+                            for v_prev, _, u_prev in reversed(stack[:-1]):
+                                matching[v_prev] = u_prev
                             return True
+                        if pu in preds:
+                            frame[2] = u
+                            stack.append([pu, iter(preds.pop(pu)), None])
+                            break
+                else:
+                    stack.pop()
             return False
 
         for v in unmatched:
-            recurse(v)
+            augment(v)
 
 
 def _outer_distance_mod_n(ref, est, modulus=12):
@@ -693,13 +834,13 @@ def match_events(ref, est, window, distance=None):
     """
     if distance is not None:
         # Compute the indices of feasible pairings
-        hits = np.where(distance(ref, est) <= window)
+        hits = _blocked_hit_windows(ref, est, window, distance)
     else:
         hits = _fast_hit_windows(ref, est, window)
 
     # Construct the graph input
     G = {}
-    for ref_i, est_i in zip(*hits):
+    for ref_i, est_i in zip(hits[0].tolist(), hits[1].tolist()):
         if est_i not in G:
             G[est_i] = []
         G[est_i].append(ref_i)
@@ -746,15 +887,91 @@ def _fast_hit_windows(ref, est, window):
     left_idx = np.searchsorted(ref_sorted, est - window, side='left')
     right_idx = np.searchsorted(ref_sorted, est + window, side='right')
 
-    hit_ref, hit_est = [], []
-
-    for j, (start, end) in enumerate(zip(left_idx, right_idx)):
-        hit_ref.extend(ref_idx[start:end])
-        hit_est.extend([j] * (end - start))
+    if len(est) < 10:
+        # For a few events, expanding each window in a loop is cheaper than
+        # the vectorized expansion below
+        hit_ref, hit_est = [], []
+        for j, (start, end) in enumerate(zip(left_idx.tolist(),
+                                             right_idx.tolist())):
+            hit_ref.extend(ref_idx[start:end].tolist())
+            hit_est.extend([j] * (end - start))
+        return np.asarray(hit_ref, dtype=int), np.asarray(hit_est, dtype=int)
+
+    # Expand each window [left_idx[j], right_idx[j]) into one hit per
+    # reference event, without materializing the full distance matrix
+    n_hits = np.maximum(right_idx - left_idx, 0)
+    hit_est = np.repeat(np.arange(len(est)), n_hits)
+    # The k-th hit overall is the (k - hit_starts[j])-th hit of est[j]
+    hit_starts = np.cumsum(n_hits) - n_hits
+    hit_ref = ref_idx[np.arange(len(hit_est)) +
+                      np.repeat(left_idx - hit_starts, n_hits)]
 
     return hit_ref, hit_est
 
 
+def _blocked_hit_windows(ref, est, window, distance, block_size=512):
+    '''Calculation of windowed hits under an arbitrary outer distance.
+
+    Given two lists of values ``ref`` and ``est``, a tolerance window, and
+    an outer distance function, computes a list of pairings ``(i, j)``
+    where ``distance(ref, est)[i, j] <= window``.
+
+    This is equivalent to the following:
+
+    >>> hit_ref, hit_est = np.where(distance(ref, est) <= window)
+
+    but the distance matrix is evaluated in blocks of at most
+    ``block_size`` by ``block_size`` entries, so the full ``(n, m)``
+    matrix is never held in memory at once.
+
+    Parameters
+    ----------
+    ref : np.ndarray, shape=(n,)
+        Array of reference values
+    est : np.ndarray, shape=(m,)
+        Array of estimated values
+    window : float >= 0
+        Size of the tolerance window
+    distance : function
+        function that computes the outer distance of ref and est.
+    block_size : int > 0
+        Maximum number of rows and columns in each block
+        (Default value = 512)
+
+    Returns
+    -------
+    hit_ref : np.ndarray
+    hit_est : np.ndarray
+        indices such that ``distance(ref, est)[hit_ref[i], hit_est[i]]
+        <= window``
+    '''
+
+    ref = np.asarray(ref)
+    est = np.asarray(est)
+
+    # Small inputs fit in a single block
+    if len(ref) <= block_size and len(est) <= block_size:
+        return np.where(distance(ref, est) <= window)
+
+    hit_ref, hit_est = [np.empty(0, dtype=int)], [np.empty(0, dtype=int)]
+
+    for i in range(0, len(ref), block_size):
+        for j in range(0, len(est), block_size):
+            block_ref, block_est = np.where(
+                distance(ref[i:i + block_size], est[j:j + block_size])
+                <= window)
+            hit_ref.append(block_ref + i)
+            hit_est.append(block_est + j)
+
+    hit_ref = np.concatenate(hit_ref)
+    hit_est = np.concatenate(hit_est)
+
+    # Restore the row-major order of the unblocked computation
+    order = np.lexsort((hit_est, hit_ref))
+
+    return hit_ref[order], hit_est[order]
+
+
 def validate_intervals(intervals):
     """Checks that an (n, 2) interval ndarray is well-formed, and raises errors
     if not.
@@ -9,6 +9,25 @@ import mir_eval
 from mir_eval import util
 
 
+def test_index_labels():
+    labels = ['b', 'A', 'a', 'c', 'B', 'b']
+
+    indices, index_to_label = util.index_labels(labels)
+    assert indices == [1, 0, 0, 2, 1, 1]
+    assert index_to_label == {0: 'a', 1: 'b', 2: 'c'}
+
+    indices, index_to_label = util.index_labels(labels, case_sensitive=True)
+    assert indices == [3, 0, 2, 4, 1, 3]
+    assert index_to_label == {0: 'A', 1: 'B', 2: 'a', 3: 'b', 4: 'c'}
+    for i, s in zip(indices, labels):
+        assert index_to_label[i] == s
+
+    # Any iterable of labels is accepted
+    indices, index_to_label = util.index_labels(s for s in 'aB')
+    assert indices == [0, 1]
+    assert index_to_label == {0: 'a', 1: 'b'}
+
+
 def test_interpolate_intervals():
     """Check that an interval set is interpolated properly, with boundaries
     conditions and out-of-range values.
@@ -31,6 +50,45 @@ def test_interpolate_intervals_gap():
             expected_ans)
 
 
+def test_interpolate_intervals_unsorted():
+    """Check that unsorted intervals are interpolated properly."""
+    labels = list('cab')
+    intervals = np.array([[2.5, 3.0], [0.5, 1.0], [1.0, 2.0]])
+    time_points = [0.0, 0.75, 1.0, 1.75, 2.25, 2.75, 3.5]
+    expected_ans = ['N', 'a', 'b', 'b', 'N', 'c', 'N']
+    assert (util.interpolate_intervals(intervals, labels, time_points, 'N') ==
+            expected_ans)
+
+
+def test_interpolate_intervals_as_array():
+    """Check that labels can be returned as an ndarray."""
+    intervals = np.array([[0.5, 1.0], [1.5, 2.0], [2.5, 3.0]])
+    time_points = [0.0, 0.75, 1.25, 1.75, 2.25, 2.75, 3.5]
+
+    labels = util.interpolate_intervals(intervals, [0, 1, 2], time_points,
+                                        -1, as_array=True)
+    assert isinstance(labels, np.ndarray)
+    assert labels.dtype.kind == 'i'
+    assert np.all(labels == [-1, 0, -1, 1, -1, 2, -1])
+
+    labels = util.interpolate_intervals(intervals, list('abc'), time_points,
+                                        as_array=True)
+    assert labels.tolist() == [None, 'a', None, 'b', None, 'c', None]
+
+    # Non-numeric fill values do not convert integer labels to strings
+    labels = util.interpolate_intervals(intervals, [0, 1, 2], time_points,
+                                        'N', as_array=True)
+    assert labels.dtype == object
+    assert labels.tolist() == ['N', 0, 'N', 1, 'N', 2, 'N']
+
+    # Sequence labels are kept intact
+    tuple_labels = [(0, 1), (1, 2), (2, 3)]
+    labels = util.interpolate_intervals(intervals, tuple_labels, time_points,
+                                        as_array=True)
+    assert labels.shape == (len(time_points),)
+    assert labels.tolist() == [None, (0, 1), None, (1, 2), None, (2, 3), None]
+
+
 @nose.tools.raises(ValueError)
 def test_interpolate_intervals_badtime():
     """Check that interpolate_intervals throws an exception if
@@ -63,6 +121,13 @@ def test_intervals_to_samples():
     assert result[0] == expected_times
     assert result[1] == expected_labels
 
+    # Samples can be returned as arrays
+    sample_times, sample_labels = util.intervals_to_samples(
+        intervals, [0, 1, 2], offset=0, sample_size=0.5, fill_value=-1,
+        as_array=True)
+    assert np.all(sample_times == [0.0, 0.5, 1.0, 1.5, 2.0, 2.5])
+    assert np.all(sample_labels == [0, 0, 1, 1, 2, 2])
+
 
 def test_intersect_files():
     """Check that two non-identical yield correct results.
@@ -115,6 +180,32 @@ def test_merge_labeled_intervals():
                              x_labels, y_intvs, y_labels)
 
 
+def test_f_measure():
+    nose.tools.eq_(util.f_measure(0., 0.), 0.)
+    assert np.allclose(util.f_measure(.5, 1.), 2 / 3.)
+    assert np.allclose(util.f_measure(.5, 1., beta=.5), .625 / 1.125)
+
+    # Array inputs are evaluated element-wise
+    precision = np.array([0., .5, 1., 0.])
+    recall = np.array([0., 1., 1., .5])
+    expected = [util.f_measure(p, r) for p, r in zip(precision, recall)]
+    assert np.allclose(util.f_measure(precision, recall), expected)
+    assert np.allclose(util.f_measure(precision, .5),
+                       [util.f_measure(p, .5) for p in precision])
+
+
+def test_intervals_to_boundaries():
+    # Contiguous intervals
+    intervals = np.array([[0.0, 1.0], [1.0, 2.5], [2.5, 3.0]])
+    boundaries = mir_eval.util.intervals_to_boundaries(intervals)
+    assert np.all(boundaries == np.array([0.0, 1.0, 2.5, 3.0]))
+
+    # Gaps, unsorted intervals and rounding
+    intervals = np.array([[2.5, 3.0], [0.0, 1.000001], [1.0, 2.0]])
+    boundaries = mir_eval.util.intervals_to_boundaries(intervals)
+    assert np.all(boundaries == np.array([0.0, 1.0, 2.0, 2.5, 3.0]))
+
+
 def test_boundaries_to_intervals():
     # Basic tests
     boundaries = np.arange(10)
@@ -122,6 +213,12 @@ def test_boundaries_to_intervals():
     intervals = mir_eval.util.boundaries_to_intervals(boundaries)
     assert np.all(intervals == correct_intervals)
 
+    # List input and a single boundary
+    intervals = mir_eval.util.boundaries_to_intervals(list(boundaries))
+    assert np.all(intervals == correct_intervals)
+    intervals = mir_eval.util.boundaries_to_intervals([1.0])
+    assert intervals.shape == (0, 2)
+
 
 def test_adjust_events():
     # Test appending at the end
@@ -144,6 +241,14 @@ def test_adjust_events():
     assert new_l[1:] == labels[:-1]
 
 
+@nose.tools.raises(ValueError)
+def test_adjust_intervals_inverted_range():
+    """Check that adjust_intervals rejects t_min > t_max."""
+    intervals = np.array([[7., 41.5], [43., 48.], [48., 51.5]])
+    labels = list('abc')
+    mir_eval.util.adjust_intervals(intervals, labels, t_min=50., t_max=20.5)
+
+
 def test_bipartite_match():
     # This test constructs a graph as follows:
     #   v9 -- (u0)
@@ -181,6 +286,21 @@ def test_bipartite_match():
         assert v in G[k] or k in G[v]
 
 
+def test_bipartite_match_long_path():
+    # The greedy initialization matches u_i to v_{i+1}, leaving u_{n-1} and
+    # v_0 unmatched; the only augmenting path then runs through every vertex,
+    # which is deeper than the default recursion limit.
+    n = 5000
+    G = dict((i, [i + 1, i]) for i in range(n - 1))
+    G[n - 1] = [n - 1]
+
+    matching = util._bipartite_match(G)
+
+    nose.tools.eq_(len(matching), n)
+    for v in matching:
+        assert v in G[matching[v]]
+
+
 def test_outer_distance_mod_n():
     ref = [1., 2., 3.]
     est = [1.1, 6., 1.9, 5., 10.]
@@ -227,6 +347,29 @@ def test_fast_hit_windows():
     assert np.all(ref_fast == ref_slow)
     assert np.all(est_fast == est_slow)
 
+    # A negative window has no hits, for short and long inputs alike
+    for n in [5, 20]:
+        ref_fast, est_fast = mir_eval.util._fast_hit_windows(
+            np.arange(n), np.arange(n) + 0.01, -0.1)
+        assert len(ref_fast) == 0
+        assert len(est_fast) == 0
+
+
+def test_blocked_hit_windows():
+
+    ref = [1., 2., 3., 11.9]
+    est = [1.1, 6., 1.9, 5., 10., 0.]
+    distance = mir_eval.util._outer_distance_mod_n
+
+    ref_slow, est_slow = np.where(distance(ref, est) <= 0.5)
+
+    for block_size in [1, 2, 3, 512]:
+        ref_blocked, est_blocked = mir_eval.util._blocked_hit_windows(
+            ref, est, 0.5, distance, block_size=block_size)
+
+        assert np.all(ref_blocked == ref_slow)
+        assert np.all(est_blocked == est_slow)
+
 
 def test_validate_intervals():
     # Test for ValueError when interval shape is invalid